@@ -1,8 +1,11 @@
 import os
+import logging
 from dotenv import load_dotenv
 
 from database.models import get_system_setting, set_system_setting
 
+logger = logging.getLogger(__name__)
+
 # Load environment variables from .env file
 load_dotenv()
 
@@ -15,6 +18,7 @@ def load_config():
     - openai_api_key: API key for OpenAI
     - slack_bot_token: Bot token for Slack authentication
     - slack_channel_id: Channel ID where bot operates
+    - slack_verify_signatures: False only if SLACK_VERIFY_SIGNATURES=false (local testing)
     - daily_word_time: Time to post daily word (e.g., "09:00")
     - timezone: Timezone for scheduling (e.g., "America/New_York")
     """
@@ -25,6 +29,7 @@ def load_config():
         'slack_bot_token': os.getenv('SLACK_BOT_TOKEN', ''),
         'slack_channel_id': os.getenv('SLACK_CHANNEL_ID', ''),
         'slack_signing_secret': os.getenv('SLACK_SIGNING_SECRET', ''),
+        'slack_verify_signatures': os.getenv('SLACK_VERIFY_SIGNATURES', 'true').lower() != 'false',
         'daily_word_time': os.getenv('DAILY_WORD_TIME', '09:00'),
         'timezone': os.getenv('TIMEZONE', 'America/New_York')
     }
@@ -62,6 +67,45 @@ def get_database_url():
     return database_url
 
 
+def get_request_threads():
+    """
+    Returns the number of request threads each server process runs, from WEB_THREADS
+    Defaults to max(8, 2 * CPUs) for waitress; gunicorn.conf.py exports its own value
+    """
+    return int(os.getenv('WEB_THREADS') or max(8, 2 * (os.cpu_count() or 1)))
+
+
+def get_database_pool_config():
+    """
+    Returns connection pool sizing for server databases (ignored for SQLite)
+    Includes: pool_size (connections kept open) and max_overflow (extra connections
+    allowed under burst load), read from SQLALCHEMY_POOL_SIZE / SQLALCHEMY_MAX_OVERFLOW
+    When those are unset, every process that holds a pool (the WEB_CONCURRENCY Gunicorn
+    workers plus the master, or the single `python run.py` process) gets an equal share of
+    DB_MAX_CONNECTIONS (default 100, Postgres' default max_connections) minus
+    DB_RESERVED_CONNECTIONS (default 10, left for admin sessions and migrations)
+    A process never needs more connections than its event workers plus request threads,
+    so the share is capped at that; get_webhook_config() in turn sizes the event workers
+    to what the pool can serve
+    Set the explicit values so that (WEB_CONCURRENCY + 1) * (pool_size + max_overflow)
+    stays below the server's max_connections
+    """
+    
+    processes = int(os.getenv('WEB_CONCURRENCY') or '0') + 1
+    budget = int(os.getenv('DB_MAX_CONNECTIONS', '100')) - int(os.getenv('DB_RESERVED_CONNECTIONS', '10'))
+    demand = int(os.getenv('WH_WORKERS') or '32') + get_request_threads()
+    total = min(max(2, budget // processes), demand)
+    default_pool_size = min(10, total // 2)
+    default_max_overflow = total - default_pool_size
+    
+    pool_config = {
+        'pool_size': int(os.getenv('SQLALCHEMY_POOL_SIZE', str(default_pool_size))),
+        'max_overflow': int(os.getenv('SQLALCHEMY_MAX_OVERFLOW', str(default_max_overflow)))
+    }
+    
+    return pool_config
+
+
 def get_slack_config():
     """
     Returns Slack-specific configuration as a dictionary
@@ -83,15 +127,15 @@ def get_slack_config():
             missing_fields.append(f"SLACK_{key.upper()}")
     
     if missing_fields:
-        print(f"Warning: Missing Slack configuration: {', '.join(missing_fields)}")
-        print("Slack integration will not work without these values.")
+        logger.warning("Missing Slack configuration: %s. "
+                       "Slack integration will not work without these values.", ', '.join(missing_fields))
     
     return slack_config
 
 
 def get_openai_config():
     """
-    Returns OpenAI configuration including API key and model name
+    Returns OpenAI configuration including API key, model name and request timeout (seconds)
     Default model: "gpt-4" or "gpt-3.5-turbo" based on preference
     Validates API key is present and properly formatted
     """
@@ -99,13 +143,14 @@ def get_openai_config():
         'api_key': os.getenv('OPENAI_API_KEY', ''),
         'model': os.getenv('OPENAI_MODEL', 'gpt-4o'),
         'max_tokens': int(os.getenv('OPENAI_MAX_TOKENS', '300')),
-        'temperature': float(os.getenv('OPENAI_TEMPERATURE', '0.7'))
+        'temperature': float(os.getenv('OPENAI_TEMPERATURE', '0.7')),
+        'timeout': float(os.getenv('OPENAI_TIMEOUT', '30'))
     }
     
     # Validate API key
     if not openai_config['api_key'] or openai_config['api_key'] == 'your_api_key_here':
-        print("Warning: OpenAI API key not configured.")
-        print("Please set OPENAI_API_KEY in .env file to use LLM features.")
+        logger.warning("OpenAI API key not configured. "
+                       "Please set OPENAI_API_KEY in .env file to use LLM features.")
         openai_config['api_key'] = None
     
     return openai_config
@@ -125,8 +170,7 @@ def get_scheduler_config():
     
     # Validate time format (HH:MM)
     if not re.match(r'^([0-1]?[0-9]|2[0-3]):[0-5][0-9]$', daily_time):
-        print(f"Warning: Invalid DAILY_WORD_TIME format: {daily_time}")
-        print("Using default: 09:00")
+        logger.warning("Invalid DAILY_WORD_TIME format: %s. Using default: 09:00", daily_time)
         daily_time = '09:00'
     
     scheduler_config = {
@@ -139,6 +183,31 @@ def get_scheduler_config():
     return scheduler_config
 
 
+def get_webhook_config():
+    """
+    Returns sizing for the pool that processes Slack events after the webhook is acknowledged
+    Includes: workers (pool threads), max_pending (events queued or running before
+    new ones are refused) and admit_timeout (seconds a webhook waits for a free slot or a
+    database connection; kept short so saturation doesn't tie up the server's request threads)
+    Each running event and each request thread can hold a database connection, so by default
+    workers is what the connection pool has left after the request threads (at most 32),
+    and max_pending is twice that
+    """
+    
+    pool_config = get_database_pool_config()
+    connections = pool_config['pool_size'] + pool_config['max_overflow']
+    default_workers = max(1, min(32, connections - get_request_threads()))
+    workers = int(os.getenv('WH_WORKERS') or default_workers)
+    
+    webhook_config = {
+        'workers': workers,
+        'max_pending': int(os.getenv('WH_MAX_PENDING') or 2 * workers),
+        'admit_timeout': float(os.getenv('WH_ADMIT_TIMEOUT', '0.2'))
+    }
+    
+    return webhook_config
+
+
 def set_theme_thread_id(session, thread_id):
     """Store the theme thread ID in database"""
     return set_system_setting(session, 'theme_thread_id', thread_id)
\ No newline at end of file
@@ -1,9 +1,10 @@
 from sqlalchemy import create_engine, text
 from sqlalchemy.orm import sessionmaker
-from sqlalchemy.pool import NullPool
+from sqlalchemy.pool import NullPool, QueuePool
 from contextlib import contextmanager
 import logging
-from config.settings import get_database_url
+import threading
+from config.settings import get_database_url, get_database_pool_config
 
 # Set up logging
 
@@ -11,6 +12,37 @@ _Session = None  # Global session variable to be initialized later
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Per-thread override of how long a connection checkout may wait (see checkout_timeout)
+_checkout_override = threading.local()
+
+
+class _OverridableTimeoutQueuePool(QueuePool):
+    """QueuePool whose checkout timeout can be shortened for the current thread"""
+
+    @property
+    def _timeout(self):
+        override = getattr(_checkout_override, 'timeout', None)
+        return self._default_timeout if override is None else override
+
+    @_timeout.setter
+    def _timeout(self, value):
+        self._default_timeout = value
+
+
+@contextmanager
+def checkout_timeout(seconds):
+    """
+    Limits how long connection checkouts in this thread wait for a free pooled connection
+    Raises sqlalchemy.exc.TimeoutError after that instead of waiting out pool_timeout,
+    so request-path work can fail fast when the pool is exhausted
+    """
+    previous = getattr(_checkout_override, 'timeout', None)
+    _checkout_override.timeout = seconds
+    try:
+        yield
+    finally:
+        _checkout_override.timeout = previous
+
 
 def create_engine_and_session():
     """
@@ -35,17 +67,21 @@ def create_engine_and_session():
                 echo=False  # Set to True for SQL query logging
             )
         else:
+            pool_config = get_database_pool_config()
             engine = create_engine(
                 database_url,
-                pool_size=5,
-                max_overflow=10,
+                poolclass=_OverridableTimeoutQueuePool,  # supports checkout_timeout()
+                pool_size=pool_config['pool_size'],
+                max_overflow=pool_config['max_overflow'],
                 pool_timeout=30,
-                pool_recycle=3600,  # Recycle connections after 1 hour
+                pool_recycle=1800,  # Recycle connections after 30 minutes
+                pool_pre_ping=True,  # Check liveness on checkout instead of with explicit probes
                 echo=False  # Set to True for SQL query logging
             )
         
-        # Create sessionmaker
-        Session = sessionmaker(bind=engine)
+        # Create sessionmaker; objects stay loaded after commit so reading them
+        # afterwards doesn't trigger a refresh query
+        Session = sessionmaker(bind=engine, expire_on_commit=False)
         
         logger.info("Database engine and session created successfully")
 
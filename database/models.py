@@ -2,12 +2,17 @@ from sqlalchemy import Column, Integer, String, Boolean, DateTime, Index
 from sqlalchemy.ext.declarative import declarative_base
 from datetime import datetime, timedelta, timezone
 import logging
+import time
 from sqlalchemy.exc import IntegrityError
 
 Base = declarative_base()
 
 logger = logging.getLogger(__name__)
 
+# Rows removed per cleanup transaction, and the pause between transactions (seconds)
+CLEANUP_BATCH_SIZE = 500
+CLEANUP_BATCH_PAUSE = 0.05
+
 class ProcessedEvent(Base):
     """Track processed Slack events for deduplication"""
     __tablename__ = 'processed_events'
@@ -51,14 +56,29 @@ def check_event_processed(session, event_key):
         # In case of error, return False to allow processing
         return False
 
-def cleanup_old_events(session, hours=24):
-    """Remove processed events older than specified hours"""
+def cleanup_old_events(session, hours=24, batch_size=CLEANUP_BATCH_SIZE):
+    """
+    Remove processed events older than specified hours
+    Deletes in batches of batch_size rows, committing after each one and pausing briefly
+    in between, so a large backlog never holds one long-running delete against the table
+    the webhook path inserts into
+    """
     try:
         cutoff_time = datetime.utcnow() - timedelta(hours=hours)
-        deleted = session.query(ProcessedEvent).filter(
-            ProcessedEvent.processed_at < cutoff_time
-        ).delete()
-        session.commit()
+        deleted = 0
+        while True:
+            ids = [row.id for row in session.query(ProcessedEvent.id).filter(
+                ProcessedEvent.processed_at < cutoff_time
+            ).limit(batch_size)]
+            if not ids:
+                break
+            deleted += session.query(ProcessedEvent).filter(
+                ProcessedEvent.id.in_(ids)
+            ).delete(synchronize_session=False)
+            session.commit()
+            if len(ids) < batch_size:
+                break
+            time.sleep(CLEANUP_BATCH_PAUSE)
         logger.info(f"Cleaned up {deleted} old processed events")
         return deleted
     except Exception as e:
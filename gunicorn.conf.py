@@ -0,0 +1,49 @@
+"""
+Gunicorn configuration for production deployments
+Run with: gunicorn -c gunicorn.conf.py
+`python run.py` still serves through waitress for local development
+"""
+import multiprocessing
+import os
+
+bind = f"0.0.0.0:{os.environ.get('PORT', '3000')}"
+wsgi_app = "run:create_app()"
+
+# Webhook handling is I/O bound, so each worker process also runs a thread pool.
+# cpu_count() reports the host's CPUs, not the container's cgroup limit, so the default is capped.
+# Every worker and the master hold a database pool: keep
+# (WEB_CONCURRENCY + 1) * (SQLALCHEMY_POOL_SIZE + SQLALCHEMY_MAX_OVERFLOW) below Postgres'
+# max_connections, or leave the pool variables unset and set DB_MAX_CONNECTIONS instead
+workers = int(os.environ.get('WEB_CONCURRENCY', min(multiprocessing.cpu_count() * 2 + 1, 4)))
+# Exported so the preloaded app sizes its per-process pools for this many workers
+os.environ['WEB_CONCURRENCY'] = str(workers)
+worker_class = "gthread"
+threads = int(os.environ.get('WEB_THREADS', 8))
+# Exported so the app counts these threads when sizing its DB pool and event workers
+os.environ['WEB_THREADS'] = str(threads)
+backlog = 2048
+
+# Worker heartbeat files live in tmpfs so a slow or overlay filesystem can't stall workers
+worker_tmp_dir = "/dev/shm"
+
+# create_app() runs once in the master before forking. Workers inherit the initialized
+# components, and the daily word timer thread stays in the master only, so the word is
+# posted once per day regardless of the number of workers.
+preload_app = True
+
+
+def post_fork(server, worker):
+    """Gives each worker its own log listener and connection pools"""
+    from run import setup_logging
+    from llm_backend.main import per_worker_init
+
+    # The master's QueueListener thread does not survive the fork. Workers log to stdout only,
+    # which Gunicorn collects; per-process rotating files would race each other on rollover
+    setup_logging(log_to_files=False)
+    per_worker_init()
+
+
+def on_exit(server):
+    """Stops the daily word timer when the master shuts down"""
+    from llm_backend.main import stop_scheduler
+    stop_scheduler()
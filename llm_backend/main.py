@@ -4,19 +4,19 @@ Handles initialization, scheduling, and webhook processing
 """
 
 import logging
-import schedule
 import time
 import threading
-import json
-from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
 from functools import wraps
 
-from config.settings import load_config, get_database_url, get_slack_config, get_openai_config, get_scheduler_config, set_theme_thread_id
-from database.database import create_engine_and_session, init_database, get_session
+from config.settings import load_config, get_database_url, get_slack_config, get_openai_config, get_scheduler_config, get_webhook_config, set_theme_thread_id
+from database.database import create_engine_and_session, init_database, get_session, checkout_timeout
 from database.models import WordHistory, check_last_word_flag, add_processed_event, check_event_processed, cleanup_old_events, get_system_setting
 from slack_integration.slack_client import SlackClient
 from llm_backend.orchestrator import post_new_word_workflow, handle_user_interaction
 from openai import OpenAI
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
 from utils.cache import TTLCache, RateLimiter  # Ensure these exist
 from .orchestrator import handle_theme_update, setup_theme_thread
 
@@ -25,15 +25,42 @@ logger = logging.getLogger(__name__)
 # Global variables for components
 app_components = {
     'config': None,
+    'engine': None,
     'db_session': None,
     'slack_client': None,
     'openai_client': None,
     'scheduler_thread': None,
-    'scheduler_stop_event': None
+    'scheduler_stop_event': None,
+    'cleanup_thread': None
 }
 
+# How often processed-event records are pruned
+CLEANUP_INTERVAL_SECONDS = 3600
+
+# Held while a cleanup runs so a slow DELETE is never stacked with another one
+_CLEANUP_LOCK = threading.Lock()
+
+# Channel the bot operates in, cached at init for the webhook reject filter
+_channel_id = None
+
+# Bounded pool that processes claimed Slack events after the webhook has been ACKed
+_webhook_config = get_webhook_config()
+EVENT_WORKER_THREADS = _webhook_config['workers']
+_event_executor = ThreadPoolExecutor(max_workers=EVENT_WORKER_THREADS, thread_name_prefix='slack-event')
+
+# Cap on events queued or running in the pool, and how briefly a webhook waits for a slot
+MAX_PENDING_EVENTS = _webhook_config['max_pending']
+EVENT_ADMIT_TIMEOUT = _webhook_config['admit_timeout']
+_pending_events = threading.BoundedSemaphore(MAX_PENDING_EVENTS)
+
 # Initialize caches and rate limiters
 event_cache = TTLCache(max_size=10000, ttl_seconds=3600)
+
+# When this process next sweeps expired keys out of event_cache. Each process that serves
+# webhooks owns its own cache, so the sweep is driven from the webhook path, not the
+# cleanup thread (which under Gunicorn runs only in the master)
+CACHE_PURGE_INTERVAL_SECONDS = 3600
+_next_cache_purge = time.monotonic() + CACHE_PURGE_INTERVAL_SECONDS
 slack_rate_limiter = RateLimiter(max_calls=60, time_window=60)  # 60 calls per minute
 openai_rate_limiter = RateLimiter(max_calls=50, time_window=60)  # 50 calls per minute
 
@@ -55,12 +82,14 @@ def initialize_application():
         # Initialize Slack client
         slack_client = SlackClient(
             token=config['slack_bot_token'],
-            channel_id=config['slack_channel_id']
+            channel_id=config['slack_channel_id'],
+            signing_secret=config['slack_signing_secret'],
+            verify_signatures=config['slack_verify_signatures']
         )
         logger.info("✓ Slack client initialized")
         
         # Initialize OpenAI client
-        openai_client = OpenAI(api_key=config['openai_api_key'])
+        openai_client = _create_openai_client(config)
         logger.info("✓ OpenAI client initialized")
         
         # Set up theme thread with proper session management
@@ -75,21 +104,68 @@ def initialize_application():
         
         components = {
             'config': config,
+            'engine': engine,
             'db_session': SessionMaker,
             'slack_client': slack_client,
             'openai_client': openai_client
         }
 
-        global app_components
+        global app_components, _channel_id
         app_components.update(components)
+        _channel_id = slack_client.channel_id
+
+        _prewarm_openai_client(openai_client)
 
         return components
         
-    except Exception as e:
-        logger.error(f"Failed to initialize application: {e}")
+    except Exception:
+        logger.exception("Failed to initialize application")
         raise
 
 
+def _create_openai_client(config):
+    """
+    Builds the shared OpenAI client
+    A bounded timeout keeps a stalled completion from pinning a worker thread for the SDK's 10 minute default
+    """
+    return OpenAI(
+        api_key=config['openai_api_key'],
+        timeout=get_openai_config()['timeout']
+    )
+
+
+def _prewarm_openai_client(openai_client):
+    """
+    Opens the OpenAI client's TLS connection in the background
+    so the handshake isn't charged to the first vocabulary reply
+    Failures are only logged; the first real request will connect as usual
+    """
+    def _prewarm():
+        try:
+            openai_client.models.list()
+            logger.info("OpenAI connection prewarmed")
+        except Exception as e:
+            logger.warning(f"OpenAI prewarm failed: {e}")
+
+    threading.Thread(target=_prewarm, name='openai-prewarm', daemon=True).start()
+
+
+def per_worker_init():
+    """
+    Re-creates per-process resources in a freshly forked worker (Gunicorn post_fork)
+    Drops pooled DB connections inherited from the master and builds a new OpenAI client,
+    since neither connection pool may be shared across processes
+    Config, the Slack client and the session factory are read-only and stay shared copy-on-write
+    """
+    engine = app_components['engine']
+    if engine is not None:
+        engine.dispose(close=False)
+    
+    if app_components['config'] is not None:
+        app_components['openai_client'] = _create_openai_client(app_components['config'])
+        _prewarm_openai_client(app_components['openai_client'])
+
+
 def scheduled_word_job():
     """Job function that runs on schedule to post new words"""
     try:
@@ -118,24 +194,47 @@ def scheduled_word_job():
                 else:
                     logger.warning("Slack client not configured, skipping word post")
                     
-    except Exception as e:
-        logger.error(f"Error in scheduled job: {e}")
+    except Exception:
+        logger.exception("Error in scheduled job")
 
 
-def scheduler_worker():
-    """Worker function that runs the scheduler in a separate thread"""
-    logger.info("Scheduler thread started")
-    
-    while not app_components['scheduler_stop_event'].is_set():
-        schedule.run_pending()
-        time.sleep(60)  # Check every minute
-    
-    logger.info("Scheduler thread stopped")
+def _seconds_until_next_run(daily_time):
+    """
+    Returns seconds from now until the next local occurrence of daily_time ("HH:MM")
+    The delay is taken between epoch timestamps; timestamp() resolves the naive local run time
+    with the local DST rules, so a timer armed across a DST change still fires at daily_time
+    """
+    now = datetime.now()
+    run_at = datetime.combine(now.date(), datetime.strptime(daily_time, '%H:%M').time())
+    if run_at <= now:
+        run_at += timedelta(days=1)
+    return max(0.0, run_at.timestamp() - time.time())
+
+
+def _schedule_next_run(daily_time):
+    """Arms a one-shot timer that fires the daily word job at the next daily_time"""
+    delay = _seconds_until_next_run(daily_time)
+    timer = threading.Timer(delay, _fire_and_reschedule, args=(daily_time,))
+    timer.daemon = True
+    timer.start()
+    app_components['scheduler_thread'] = timer
+    logger.info(f"Next daily word post in {delay / 3600:.2f} hours")
+    return timer
+
+
+def _fire_and_reschedule(daily_time):
+    """Runs the daily word job, then re-arms the timer for the following day"""
+    if app_components['scheduler_stop_event'].is_set():
+        return
+    scheduled_word_job()
+    if not app_components['scheduler_stop_event'].is_set():
+        _schedule_next_run(daily_time)
 
 
 def start_scheduler():
     """
     Starts the background scheduler for daily word posting
+    Uses a one-shot timer re-armed after every run, so nothing wakes up between posts
     """
     try:
         scheduler_config = get_scheduler_config()
@@ -144,8 +243,6 @@ def start_scheduler():
         daily_time = scheduler_config['daily_word_time']
         logger.info(f"Scheduling daily word posting at {daily_time}")
         
-        schedule.every().day.at(daily_time).do(scheduled_word_job)
-        
         # Also run immediately if this is the first run
         if app_components['db_session']:
             with get_session() as session:
@@ -153,29 +250,36 @@ def start_scheduler():
                     logger.info("No words in database, running initial word post")
                     scheduled_word_job()
         
-        # Start scheduler thread
+        # Arm the timer for the next daily run
         app_components['scheduler_stop_event'] = threading.Event()
-        scheduler_thread = threading.Thread(target=scheduler_worker, daemon=True)
-        scheduler_thread.start()
-        app_components['scheduler_thread'] = scheduler_thread
+        scheduler_thread = _schedule_next_run(daily_time)
+        
+        # Start the hourly processed-event cleanup
+        cleanup_thread = threading.Thread(target=cleanup_worker, daemon=True)
+        cleanup_thread.start()
+        app_components['cleanup_thread'] = cleanup_thread
         
         logger.info(f"Scheduler started - will post daily at {daily_time}")
         return scheduler_thread
         
-    except Exception as e:
-        logger.error(f"Failed to start scheduler: {e}")
+    except Exception:
+        logger.exception("Failed to start scheduler")
         raise
 
 
 def stop_scheduler():
-    """Stops the scheduler thread gracefully"""
+    """Stops the scheduler timer gracefully"""
     if app_components['scheduler_stop_event']:
         logger.info("Stopping scheduler...")
         app_components['scheduler_stop_event'].set()
         
         if app_components['scheduler_thread']:
+            app_components['scheduler_thread'].cancel()
             app_components['scheduler_thread'].join(timeout=5)
             logger.info("Scheduler stopped")
+        
+        if app_components['cleanup_thread']:
+            app_components['cleanup_thread'].join(timeout=5)
 
 
 def with_retry(max_retries=3, backoff_factor=2):
@@ -200,82 +304,135 @@ def with_retry(max_retries=3, backoff_factor=2):
         return wrapper
     return decorator
 
-def webhook_handler(request_data):
+def webhook_handler(data):
     """
     ACK-first Slack webhook handler.
-    - Parse the payload.
+    - Take the payload already decoded (once, with orjson) by SlackClient.validate_webhook;
+      callers holding raw text must go through validate_webhook with bytes, not pass strings here.
+    - Dispatch on the payload type (URL verification or event callback).
+    - Drop events that can never be a vocabulary reply before any other work.
     - Generate a reliable dedupe key.
     - Drop duplicates fast (memory cache).
     - CLAIM the event in DB (unique insert) before doing any heavy work.
-    - Start a background thread to process the event.
+    - Hand the event to the background worker pool.
     - Immediately return 200 to Slack so it doesn't retry.
     """
     try:
-        # 1) Parse request body safely
-        try:
-            data = json.loads(request_data) if isinstance(request_data, str) else request_data
-        except json.JSONDecodeError as e:
-            logger.error(f"Invalid JSON in webhook: {e}")
-            return {'statusCode': 400, 'body': 'Invalid JSON'}
-
-        # 2) Slack URL verification handshake
-        if data.get('type') == 'url_verification':
-            return {'statusCode': 200, 'body': data.get('challenge')}
-
-        # 3) Pull out the actual event
-        event = data.get('event', {})
-        if not event:
-            logger.warning("No event in webhook payload")
-            return {'statusCode': 200, 'body': 'No event'}
-
-        # 4) Build a dedupe key (event_id > client_msg_id > ts+user > fallback)
-        dedupe_key = _generate_dedupe_key(event, data)
-        if not dedupe_key:
-            logger.error("Could not generate deduplication key")
-            dedupe_key = f"fallback_{datetime.now().timestamp()}"
-
-        # 5) Fast in-memory duplicate drop (cheap + thread-safe TTL cache)
-        if event_cache.contains(dedupe_key):
-            logger.debug(f"Event already processed (cache hit): {dedupe_key}")
-            return {'statusCode': 200, 'body': 'Already processed'}
-
-        # 6) CLAIM in DB *before* doing any heavy work.
-        #    add_processed_event() returns True if we inserted (i.e., we own it),
-        #    False if a duplicate key already exists (someone else is/was processing).
-        claimed = False
-        try:
-            with get_session() as session:
-                claimed = add_processed_event(session, dedupe_key, event.get('type'))
-        except Exception as e:
-            # If DB is down for a moment, don't crash the webhook; rely on cache only.
-            logger.error(f"DB claim failed (continuing with cache claim): {e}")
+        handler = _WEBHOOK_DISPATCH.get(data.get('type'))
+        if handler is None:
+            return {'statusCode': 200, 'body': 'Ignored'}
+        return handler(data)
+
+    except Exception:
+        logger.exception("Unexpected error in webhook handler")
+        return {'statusCode': 500, 'body': 'Internal server error'}
 
-        if not claimed:
-            # Another request already claimed this event; mark cache and ACK.
-            event_cache.add(dedupe_key)
-            return {'statusCode': 200, 'body': 'Already processed'}
 
-        # 7) Put into cache so parallel workers in this process immediately drop it.
+def _handle_url_verification(data):
+    """Slack URL verification handshake"""
+    return {'statusCode': 200, 'body': data.get('challenge')}
+
+
+def _handle_event_callback(data):
+    """Dedupes, claims and hands off an event_callback payload to the event worker pool"""
+    # 1) Pull out the actual event
+    event = data.get('event')
+    if not event:
+        logger.warning("No event in webhook payload")
+        return {'statusCode': 200, 'body': 'No event'}
+
+    # 2) Cheap reject before any dedupe or DB work. Most traffic is bot posts and
+    #    top-level channel messages, so the missing thread_ts check goes first.
+    get = event.get
+    if (not get('thread_ts') or get('bot_id') or get('type') != 'message'
+            or get('channel') != _channel_id):
+        return {'statusCode': 200, 'body': 'Ignored'}
+
+    # 3) Build a dedupe key (event_id > client_msg_id > ts+user > fallback)
+    dedupe_key = _generate_dedupe_key(event, data)
+    if not dedupe_key:
+        logger.error("Could not generate deduplication key")
+        dedupe_key = f"fallback_{datetime.now().timestamp()}"
+
+    # 4) Fast in-memory duplicate drop (cheap + thread-safe TTL cache)
+    if event_cache.contains(dedupe_key):
+        logger.debug("Event already processed (cache hit): %s", dedupe_key)
+        return {'statusCode': 200, 'body': 'Already processed'}
+    _maybe_purge_event_cache()
+
+    # 5) Admission control: cap the events queued or running in the worker pool.
+    #    If no slot frees up within the short admit timeout, answer 429 right away so the
+    #    request thread is released and Slack redelivers later; nothing has been claimed
+    #    yet, so the redelivery is processed normally.
+    if not _pending_events.acquire(timeout=EVENT_ADMIT_TIMEOUT):
+        logger.warning("Event worker pool saturated, deferring %s", dedupe_key)
+        return {'statusCode': 429, 'body': 'Busy'}
+
+    # 6) CLAIM in DB *before* doing any heavy work.
+    #    add_processed_event() returns True if we inserted (i.e., we own it),
+    #    False if a duplicate key already exists (someone else is/was processing).
+    #    The claim runs on the request thread, so a full connection pool gets the same
+    #    fast 429 as a full worker pool instead of waiting out pool_timeout.
+    claimed = False
+    try:
+        with checkout_timeout(EVENT_ADMIT_TIMEOUT), get_session() as session:
+            claimed = add_processed_event(session, dedupe_key, event.get('type'))
+    except PoolTimeoutError:
+        _pending_events.release()
+        logger.warning("Database pool exhausted, deferring %s", dedupe_key)
+        return {'statusCode': 429, 'body': 'Busy'}
+    except Exception as e:
+        # If DB is down for a moment, don't crash the webhook; rely on cache only.
+        logger.error("DB claim failed (continuing with cache claim): %s", e)
+
+    if not claimed:
+        # Another request already claimed this event; mark cache and ACK.
+        _pending_events.release()
         event_cache.add(dedupe_key)
+        return {'statusCode': 200, 'body': 'Already processed'}
 
-        # 8) Do the heavy work in the background so we can ACK fast.
-        def _worker():
-            try:
-                # Note: we moved any Slack rate limiting checks into the worker
-                # (do NOT 429 the webhook — Slack will retry).
-                _process_event_with_error_handling(event, data)
-            except Exception as e:
-                logger.error(f"Background event processing failed: {e}", exc_info=True)
-                # We already claimed the event; don't un-claim it. Failures are logged.
+    # 7) Put into cache so parallel workers in this process immediately drop it.
+    event_cache.add(dedupe_key)
 
-        threading.Thread(target=_worker, daemon=True).start()
+    # 8) Do the heavy work in the background so we can ACK fast.
+    def _worker():
+        try:
+            # Note: we moved any Slack rate limiting checks into the worker
+            # (do NOT 429 the webhook — Slack will retry).
+            _process_event_with_error_handling(event, data)
+        except Exception:
+            logger.exception("Background event processing failed")
+            # We already claimed the event; don't un-claim it. Failures are logged.
+        finally:
+            _pending_events.release()
 
-        # 9) IMPORTANT: return 200 immediately so Slack doesn't retry.
-        return {'statusCode': 200, 'body': 'Accepted'}
+    try:
+        _event_executor.submit(_worker)
+    except Exception:
+        _pending_events.release()
+        raise
 
-    except Exception as e:
-        logger.error(f"Unexpected error in webhook handler: {e}", exc_info=True)
-        return {'statusCode': 500, 'body': 'Internal server error'}
+    # 9) IMPORTANT: return 200 immediately so Slack doesn't retry.
+    return {'statusCode': 200, 'body': 'Accepted'}
+
+
+_WEBHOOK_DISPATCH = {
+    'url_verification': _handle_url_verification,
+    'event_callback': _handle_event_callback,
+}
+
+
+def _maybe_purge_event_cache():
+    """
+    Hands an event_cache sweep to the event worker pool once per CACHE_PURGE_INTERVAL_SECONDS
+    The full scan runs off the request thread; a rare double submit from racing requests is harmless
+    """
+    global _next_cache_purge
+    now = time.monotonic()
+    if now < _next_cache_purge:
+        return
+    _next_cache_purge = now + CACHE_PURGE_INTERVAL_SECONDS
+    _event_executor.submit(event_cache.purge_expired)
 
 
 def _generate_dedupe_key(event, data):
@@ -303,7 +460,7 @@ def _generate_dedupe_key(event, data):
         return None
         
     except Exception as e:
-        logger.error(f"Error generating dedupe key: {e}")
+        logger.error("Error generating dedupe key: %s", e)
         return None
 
 def _process_event_with_error_handling(event, data):
@@ -318,7 +475,7 @@ def _process_event_with_error_handling(event, data):
         
         # Handle only message events in threads
         if event_type != 'message':
-            logger.debug(f"Ignoring non-message event: {event_type}")
+            logger.debug("Ignoring non-message event: %s", event_type)
             return {'statusCode': 200, 'body': 'Not a message event'}
         
         # Check if it's a thread message
@@ -333,13 +490,13 @@ def _process_event_with_error_handling(event, data):
         channel = event.get('channel')
         
         if not user_id or not text:
-            logger.warning(f"Missing user_id or text: user={user_id}, text={text}")
+            logger.warning("Missing user_id or text: user=%s, text=%s", user_id, text)
             return {'statusCode': 200, 'body': 'Missing data'}
         
         # Slack rate limiting check
         if not slack_rate_limiter.is_allowed():
             wait = slack_rate_limiter.wait_time()
-            logger.warning(f"Slack rate limited; sleeping {wait}s")
+            logger.warning("Slack rate limited; sleeping %ss", wait)
             time.sleep(wait)
         
         # Check if this is the theme thread
@@ -352,7 +509,7 @@ def _process_event_with_error_handling(event, data):
         event_id = data.get('event_id', '')
         message_ts = event.get('ts', '')
 
-        logger.debug(f"Processing vocabulary interaction: thread={thread_ts}, user={user_id}, text={text[:50]}")
+        logger.debug("Processing vocabulary interaction: thread=%s, user=%s, text=%.50s", thread_ts, user_id, text)
 
         
         with get_session() as session:
@@ -369,8 +526,8 @@ def _process_event_with_error_handling(event, data):
         
         return {'statusCode': 200, 'body': 'Processed'}
         
-    except Exception as e:
-        logger.error(f"Error in event processing: {e}", exc_info=True)
+    except Exception:
+        logger.exception("Error in event processing")
         raise
 
 
@@ -400,10 +557,29 @@ def _handle_theme_update(user_id, text,session):
 
 # Cleanup job to run periodically
 def cleanup_old_data():
-    """Clean up old processed events from database"""
+    """Clean up old processed events from database, skipping the run if one is already in progress"""
+    if not _CLEANUP_LOCK.acquire(blocking=False):
+        logger.info("Cleanup already running, skipping")
+        return
     try:
         with get_session() as session:
             cleanup_old_events(session, hours=24)
         logger.info("Cleanup job completed successfully")
     except Exception as e:
-        logger.error(f"Cleanup job failed: {e}")
\ No newline at end of file
+        logger.error(f"Cleanup job failed: {e}")
+    finally:
+        _CLEANUP_LOCK.release()
+
+
+def cleanup_worker():
+    """
+    Runs cleanup_old_data every CLEANUP_INTERVAL_SECONDS until the scheduler stop event is set
+    Blocks on the event between runs, so it costs nothing while idle and exits as soon as it is set
+    """
+    stop_event = app_components['scheduler_stop_event']
+    logger.info("Cleanup thread started")
+    
+    while not stop_event.wait(timeout=CLEANUP_INTERVAL_SECONDS):
+        cleanup_old_data()
+    
+    logger.info("Cleanup thread stopped")
@@ -56,10 +56,8 @@ def post_new_word_workflow(session, slack_client):
     Complete workflow for generating and posting a new word
     Step 1: Generate new word using word_generator.generate_word
     Step 2: Create new thread in Slack with the word
-    Step 3: Post definitions as first reply in thread
-    Step 4: Post examples as second reply in thread
-    Step 5: Post instructions as third reply in thread
-    Step 6: Only after confirming all Slack posts successful, add word to database with thread_id
+    Step 3: Post definitions, examples and instructions as one sectioned reply in thread
+    Step 4: Only after confirming all Slack posts successful, add word to database with thread_id
     Returns True if entire workflow succeeds
     Returns False and rolls back if any step fails
     Ensures database stays in sync with Slack posts
@@ -99,16 +97,15 @@ def post_new_word_workflow(session, slack_client):
             
             logger.info(f"Created thread with ID: {thread_id}")
             
-            # Step 3-5: Post replies in order
-            for i, message in enumerate(slack_messages[1:], 1):
-                logger.debug(f"Posting reply {i} to thread")
-                success = slack_client.post_to_thread(thread_id, message)
-                if not success:
-                    logger.error(f"Failed to post message {i} to thread")
-                    session.rollback()
-                    return False
+            # Step 3: Post the remaining messages as sections of a single reply
+            logger.debug("Posting word details to thread")
+            success = slack_client.post_sections_to_thread(thread_id, slack_messages[1:])
+            if not success:
+                logger.error("Failed to post word details to thread")
+                session.rollback()
+                return False
             
-            # Step 6: All Slack posts successful, save to database with thread_id
+            # Step 4: All Slack posts successful, save to database with thread_id
             logger.debug("Saving word to database with thread_id")
             new_word = create_word(session, word_data["word"], thread_id=thread_id)
             session.commit()
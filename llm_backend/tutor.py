@@ -45,7 +45,7 @@ def process_user_message(session, thread_id, user_message, slack_client):
 def fetch_thread_context(slack_client, thread_id):
     """
     Retrieves all messages from a specific Slack thread
-    Calls slack_client.get_thread_messages with thread_id
+    Streams slack_client.iter_thread_messages for thread_id
     Formats messages into readable context for LLM
     Includes message sender (bot/user) and content
     Preserves chronological order of messages
@@ -55,16 +55,9 @@ def fetch_thread_context(slack_client, thread_id):
     logger.debug(f"Fetching thread context for {thread_id}")
     
     try:
-        # Get all messages in the thread
-        messages = slack_client.get_thread_messages(thread_id)
-        
-        if not messages:
-            logger.warning(f"No messages found in thread {thread_id}")
-            return ""
-        
-        # Format messages for context
+        # Format messages for context as each page of the thread arrives
         context_lines = []
-        for msg in messages:
+        for msg in slack_client.iter_thread_messages(thread_id):
             # Determine if message is from bot or user
             sender = "Bot" if msg.get('bot_id') else "User"
             text = msg.get('text', '')
@@ -73,6 +66,10 @@ def fetch_thread_context(slack_client, thread_id):
             if text:
                 context_lines.append(f"{sender}: {text}")
         
+        if not context_lines:
+            logger.warning(f"No messages found in thread {thread_id}")
+            return ""
+        
         context = "\n".join(context_lines)
         logger.debug(f"Thread context ({len(context_lines)} messages) retrieved")
         return context
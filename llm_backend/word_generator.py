@@ -208,8 +208,8 @@ def parse_word_response(llm_response):
     except (json.JSONDecodeError, ValueError) as e:
         # Fallback: try to extract word from response even if not proper JSON
         # This is a safety net but shouldn't normally be needed
-        print(f"Failed to parse LLM response as JSON: {e}")
-        print(f"Raw response: {llm_response}")
+        logger.warning("Failed to parse LLM response as JSON: %s", e)
+        logger.debug("Raw response: %s", llm_response)
         
         # Return None to trigger retry
         return None
@@ -1,74 +1,238 @@
+import atexit
 import os
+import queue
 import signal
 import sys
 import threading
 import time
 import logging
-from flask import Flask, request, jsonify
-from waitress import serve
+from logging.handlers import QueueHandler
+import orjson
+from flask import Flask, Response, request
+from flask.json.provider import JSONProvider
 
-from llm_backend.main import initialize_application, start_scheduler as start_main_scheduler, webhook_handler, stop_scheduler
-from slack_integration.slack_client import SlackClient
+from utils.logging_handlers import BufferedRotatingFileHandler, FlushingQueueListener
+
+# The LLM backend pulls in openai, sqlalchemy and slack_sdk, and waitress is only needed
+# by main(); they are imported inside the functions below so importing this module stays cheap
+
+LOG_DIR = 'logs'
+LOG_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
 
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-)
 logger = logging.getLogger(__name__)
+log_listener = None
+
+def setup_logging(log_to_files=True):
+    """
+    Configures root logging to go through an in-memory queue
+    A background QueueListener thread writes records to stdout, a rotating log file and
+    a separate rotating error log, so request threads never block on disk I/O
+    File writes are buffered and flushed every second, or immediately for errors
+    With log_to_files=False only stdout is used; under Gunicorn several processes would
+    otherwise rotate the same files independently and interleave partial buffered writes
+    Returns the started listener
+    """
+    global log_listener
+    formatter = logging.Formatter(LOG_FORMAT)
+    
+    # Windows consoles default to a legacy code page that can't encode the ✓ in startup logs.
+    # reconfigure() switches the existing streams in place, so repeated calls are no-ops
+    if sys.platform == 'win32' and (getattr(sys.stdout, 'encoding', '') or '').lower() != 'utf-8':
+        sys.stdout.reconfigure(encoding='utf-8')
+        sys.stderr.reconfigure(encoding='utf-8')
+    
+    console_handler = logging.StreamHandler(sys.stdout)
+    console_handler.setFormatter(formatter)
+    handlers = [console_handler]
+    
+    if log_to_files:
+        handlers.extend(_file_handlers(formatter))
+    
+    log_queue = queue.SimpleQueue()
+    root_logger = logging.getLogger()
+    root_logger.setLevel(logging.INFO)
+    root_logger.handlers = [QueueHandler(log_queue)]
+    
+    log_listener = FlushingQueueListener(log_queue, *handlers, respect_handler_level=True)
+    log_listener.start()
+    atexit.register(log_listener.stop)
+    return log_listener
+
+def _file_handlers(formatter):
+    """Builds the buffered rotating handlers for the main log and the error-only log"""
+    os.makedirs(LOG_DIR, exist_ok=True)
+    
+    file_handler = BufferedRotatingFileHandler(
+        os.path.join(LOG_DIR, 'vocabulary_tutor.log'),
+        maxBytes=50_000_000,
+        backupCount=5,
+        encoding='utf-8'
+    )
+    file_handler.setFormatter(formatter)
+    
+    error_handler = BufferedRotatingFileHandler(
+        os.path.join(LOG_DIR, 'errors.log'),
+        maxBytes=10_000_000,
+        backupCount=5,
+        encoding='utf-8'
+    )
+    error_handler.setLevel(logging.ERROR)
+    error_handler.setFormatter(formatter)
+    return file_handler, error_handler
+
+class ORJSONProvider(JSONProvider):
+    """Flask JSON provider backed by orjson"""
+    
+    def dumps(self, obj, **kwargs):
+        return orjson.dumps(obj).decode()
+    
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
+def json_response(obj, status=200):
+    """Serializes obj with orjson straight into a Response, skipping jsonify's argument handling"""
+    return Response(orjson.dumps(obj), status=status, mimetype='application/json')
 
 # Global variables
 app = Flask(__name__)
+app.json = ORJSONProvider(app)
+db_engine = None
+webhook_handler = None
 session_maker = None
 slack_client = None
 scheduler_thread = None
 openai_client = None
 
+# Health probes can arrive every few seconds; reuse the last DB check for this long
+HEALTH_CACHE_TTL = 5.0
+_HEALTH_CACHE = {'ts': 0.0, 'ok': False}
+_HEALTH_LOCK = threading.Lock()
+_HEALTHY_BODY = orjson.dumps({"status": "healthy"})
+_READY_BODY = orjson.dumps({"status": "ready"})
+_NOT_READY_BODY = orjson.dumps({"status": "not ready"})
+
 def initialize_app():
     """Initialize all application components"""
-    global session_maker, slack_client, openai_client
+    global db_engine, webhook_handler, session_maker, slack_client, openai_client
     
     try:
+        from llm_backend.main import initialize_application, webhook_handler as handler
+        
         components = initialize_application()
+        # Resolved once here so slack_events doesn't run an import per request
+        webhook_handler = handler
+        db_engine = components['engine']
         slack_client = components['slack_client']
         session_maker = components['db_session']
         openai_client = components['openai_client']
         return True
-    except Exception as e:
-        logger.error(f"Failed to initialize application: {e}")
+    except Exception:
+        logger.exception("Failed to initialize application")
         return False
 
 def start_scheduler():
     """Start the daily word scheduler from main.py"""
     try:
+        from llm_backend.main import start_scheduler as start_main_scheduler
         start_main_scheduler()    
-    except Exception as e:
-        logger.error(f"Failed to start scheduler: {e}")
+    except Exception:
+        logger.exception("Failed to start scheduler")
+
+def database_healthy():
+    """Returns the cached database probe result, re-probing at most once per HEALTH_CACHE_TTL"""
+    if db_engine is None:
+        return False
+    
+    from database.database import test_connection
+    with _HEALTH_LOCK:
+        now = time.monotonic()
+        if now - _HEALTH_CACHE['ts'] >= HEALTH_CACHE_TTL:
+            _HEALTH_CACHE.update(ts=now, ok=test_connection(db_engine))
+        return _HEALTH_CACHE['ok']
 
 @app.route('/health', methods=['GET'])
 def health_check():
-    """Health check endpoint"""
-    return jsonify({"status": "healthy"}), 200
+    """
+    Health check endpoint
+    Answers from memory and never touches the database; readiness is /healthz/ready
+    """
+    return Response(_HEALTHY_BODY, status=200, mimetype='application/json')
+
+@app.route('/healthz/live', methods=['GET'])
+def liveness_check():
+    """Liveness probe: the process is up and serving requests"""
+    return Response(_HEALTHY_BODY, status=200, mimetype='application/json')
+
+@app.route('/healthz/ready', methods=['GET'])
+def readiness_check():
+    """
+    Readiness probe: components are initialized and the database answers
+    The database result is cached for HEALTH_CACHE_TTL, so bursts of probes issue at most one query
+    """
+    if webhook_handler is None or slack_client is None or not database_healthy():
+        return Response(_NOT_READY_BODY, status=503, mimetype='application/json')
+    return Response(_READY_BODY, status=200, mimetype='application/json')
 
 @app.route('/slack/events', methods=['POST'])
 def slack_events():
     """Handle Slack webhook events using main.py webhook_handler"""
+    # Bind the request headers once; every attribute access on `request` goes through the context proxy
+    headers = request.headers
     try:
-        result = webhook_handler(request.get_json())
-        return jsonify(result.get('body', {})), result.get('statusCode', 200)
-    except Exception as e:
-        logger.error(f"Error handling Slack event: {e}")
-        return jsonify({"error": "Internal server error"}), 500
+        # Slack retries are processed like any other delivery: the original may never have
+        # been handled (dropped from the accept queue, or refused with a 429), and
+        # webhook_handler's event-cache and processed_events claim already drop true duplicates
+        
+        # Read the body exactly once; the Slack client verifies the signature on these bytes
+        # and decodes them in the same pass. Nothing else reads the stream, so werkzeug needn't keep a copy
+        raw_body = request.get_data(cache=False)
+        is_valid, data = slack_client.validate_webhook(raw_body, headers)
+        if not is_valid:
+            return json_response({"error": "Invalid signature"}, 401)
+        if data is None:
+            return json_response({"error": "Invalid JSON"}, 400)
+        
+        # Answer Slack's URL verification with the bare challenge as plain text;
+        # running it through json_response would wrap it in quotes
+        if data.get('type') == 'url_verification':
+            return Response(data.get('challenge', ''), status=200, mimetype='text/plain')
+        
+        result = webhook_handler(data)
+        return json_response(result.get('body', {}), result.get('statusCode', 200))
+    except Exception:
+        logger.exception("Error handling Slack event")
+        return json_response({"error": "Internal server error"}, 500)
 
 def handle_shutdown(signum, frame):
     """Gracefully handle application shutdown"""
+    from llm_backend.main import stop_scheduler
     logger.info("Received shutdown signal, cleaning up...")
     stop_scheduler()
     logger.info("Application shutdown complete")
+    # Drain queued log records before the process exits
+    if log_listener:
+        log_listener.stop()
     sys.exit(0)
 
+def create_app():
+    """
+    Sets up logging, initializes all components and starts the scheduler
+    Returns the Flask app; this is the Gunicorn entry point (see gunicorn.conf.py)
+    Logs go to stdout only, since the master and every worker would each rotate the log files
+    Raises RuntimeError if initialization fails
+    """
+    setup_logging(log_to_files=False)
+    logger.info("Starting Vocabulary Tutor application under Gunicorn...")
+    
+    if not initialize_app():
+        raise RuntimeError("Application initialization failed")
+    
+    start_scheduler()
+    return app
+
 def main():
     """Main application entry point"""
+    setup_logging()
     logger.info("Starting Vocabulary Tutor application...")
     
     # Set up signal handlers for graceful shutdown
@@ -88,8 +252,13 @@ def main():
     
     logger.info(f"Starting webhook server on port {port}")
     
-    # Start Flask app
-    serve(app, host="0.0.0.0", port=port)
+    # Start Flask app. Waitress accepts connections on an asyncore loop and hands requests
+    # to its thread pool; the larger backlog absorbs bursts of Slack retries
+    from waitress import serve
+    from config.settings import get_request_threads
+    threads = get_request_threads()
+    serve(app, host="0.0.0.0", port=port, threads=threads, backlog=2048,
+          connection_limit=1000, channel_timeout=30)
 
 
 if __name__ == "__main__":
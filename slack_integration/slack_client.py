@@ -1,34 +1,68 @@
 from slack_sdk import WebClient
 from slack_sdk.errors import SlackApiError
-import json
+from slack_sdk.http_retry.builtin_handlers import ConnectionErrorRetryHandler, RateLimitErrorRetryHandler
+import orjson
 import hashlib
 import hmac
+import ssl
 import time
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Requests signed longer ago than this are rejected as possible replays (seconds)
+SIGNATURE_MAX_AGE = 300
+
+# Messages requested per conversations.replies page; Slack's maximum, so most threads take one call
+THREAD_PAGE_SIZE = 1000
+
+# Section headers and closing section of every word sequence
+MEANINGS_HEADER = "📖 *Meanings:*\n"
+EXAMPLES_HEADER = "💡 *Examples:*\n"
+WORD_INSTRUCTIONS = (
+    "🎯 *Your turn!*\n"
+    "• Reply '1' if you already knew this word\n"
+    "• Or use the word in an original sentence to learn it"
+)
+
 
 class SlackClient:
-    def __init__(self, token, channel_id):
+    def __init__(self, token, channel_id, signing_secret=None, verify_signatures=True):
         """
         Initializes Slack client with authentication
-        Takes bot token and channel ID as parameters
+        Takes bot token, channel ID and the app's signing secret as parameters
+        Webhook signature verification is on unless verify_signatures is False; with it on
+        and no signing secret configured, every webhook is rejected
         Creates WebClient from slack_sdk with the token
+        Shares one SSL context across all calls and retries connection errors and rate limits
         Stores channel_id for all future operations
         Validates authentication by calling auth.test
         Raises exception if authentication fails
         """
         self.token = token
+        self.signing_secret = signing_secret.encode() if signing_secret else None
+        self.verify_signatures = verify_signatures
+        if not verify_signatures:
+            logger.warning("Webhook signature verification disabled by SLACK_VERIFY_SIGNATURES=false")
+        elif self.signing_secret is None:
+            logger.error("SLACK_SIGNING_SECRET not configured; all webhooks will be rejected")
         self.channel_id = channel_id
-        self.client = WebClient(token=token)
+        # A prebuilt SSL context saves reloading the CA bundle on every API call
+        self.client = WebClient(
+            token=token,
+            ssl=ssl.create_default_context(),
+            retry_handlers=[
+                ConnectionErrorRetryHandler(max_retry_count=3),
+                RateLimitErrorRetryHandler(max_retry_count=3),
+            ]
+        )
         
         # Validate authentication
         try:
             auth_response = self.client.auth_test()
             self.bot_id = auth_response["bot_id"]
             self.bot_user_id = auth_response["user_id"]
-            logger.info(f"Slack authentication successful. Bot ID: {self.bot_id}")
+            logger.info("Slack authentication successful. Bot ID: %s", self.bot_id)
         except SlackApiError as e:
             raise Exception(f"Slack authentication failed: {e.response['error']}")
     
@@ -47,17 +81,18 @@ class SlackClient:
                 text=initial_message
             )
             thread_id = response['ts']
-            logger.info(f"Created new thread with ID: {thread_id}")
+            logger.info("Created new thread with ID: %s", thread_id)
             return thread_id
         except SlackApiError as e:
             error_msg = f"Failed to create thread: {e.response['error']}"
             logger.error(error_msg)
             raise Exception(error_msg)
     
-    def post_to_thread(self, thread_id, message):
+    def post_to_thread(self, thread_id, message, blocks=None):
         """
         Posts a reply message within an existing thread
-        Takes thread_id (timestamp) and message text as parameters
+        Takes thread_id (timestamp) and message text as parameters, plus optional Block Kit
+        blocks; when blocks are given, message is the notification/fallback text
         Uses chat.postMessage with thread_ts parameter
         Maintains thread continuity by replying to correct thread
         Returns message timestamp of the posted reply
@@ -67,109 +102,124 @@ class SlackClient:
             response = self.client.chat_postMessage(
                 channel=self.channel_id,
                 text=message,
+                blocks=blocks,
                 thread_ts=thread_id
             )
             message_ts = response['ts']
-            logger.info(f"Posted message to thread {thread_id}")
+            logger.info("Posted message to thread %s", thread_id)
             return message_ts
         except SlackApiError as e:
             error_msg = f"Failed to post to thread: {e.response['error']}"
             logger.error(error_msg)
             raise Exception(error_msg)
     
-    def get_thread_messages(self, thread_id):
+    def post_sections_to_thread(self, thread_id, sections):
         """
-        Fetches all messages within a specific thread
-        Takes thread_id (timestamp) as parameter
-        Uses conversations.replies API endpoint
-        Returns list of message dictionaries with:
+        Posts several mrkdwn sections as a single thread reply
+        Takes thread_id (timestamp) and a list of message texts
+        Renders each text as a section block separated by dividers, so one chat.postMessage
+        call replaces one call per section
+        The plain-text fallback holds the full content, so conversations.replies readers
+        (like the tutor's thread history) still see every section
+        Returns message timestamp of the posted reply
+        """
+        blocks = []
+        for section in sections:
+            if blocks:
+                blocks.append({"type": "divider"})
+            blocks.append({"type": "section", "text": {"type": "mrkdwn", "text": section}})
+        return self.post_to_thread(thread_id, "\n\n".join(sections), blocks=blocks)
+    
+    def get_thread_messages_page(self, thread_id, cursor=None, limit=THREAD_PAGE_SIZE):
+        """
+        Fetches one page of messages within a specific thread
+        Takes thread_id (timestamp), the cursor returned by a previous call (None for the
+        first page) and the page size
+        Makes exactly one conversations.replies call
+        Returns (messages, next_cursor) where messages are dictionaries with:
         - user: ID of message sender
         - text: message content
         - ts: timestamp
         - bot_id: present if message is from bot
-        Handles pagination if thread has many messages
-        Sorts messages chronologically
+        next_cursor is None once the thread is exhausted; it is opaque and can be stored to resume later
         """
         try:
-            messages = []
-            cursor = None
-            
-            while True:
-                # Fetch messages with pagination support
-                response = self.client.conversations_replies(
-                    channel=self.channel_id,
-                    ts=thread_id,
-                    cursor=cursor,
-                    limit=100  # Fetch up to 100 messages at a time
-                )
-                
-                messages.extend(response['messages'])
-                
-                # Check if there are more messages
-                if not response.get('has_more', False):
-                    break
-                    
-                cursor = response.get('response_metadata', {}).get('next_cursor')
-            
-            # Messages are already sorted chronologically by Slack
-            logger.info(f"Retrieved {len(messages)} messages from thread {thread_id}")
-            
-            # Format messages for return
-            formatted_messages = []
-            for msg in messages:
-                formatted_msg = {
-                    'user': msg.get('user', ''),
-                    'text': msg.get('text', ''),
-                    'ts': msg.get('ts', ''),
-                }
-                if 'bot_id' in msg:
-                    formatted_msg['bot_id'] = msg['bot_id']
-                formatted_messages.append(formatted_msg)
-            
-            return formatted_messages
-            
+            response = self.client.conversations_replies(
+                channel=self.channel_id,
+                ts=thread_id,
+                cursor=cursor,
+                limit=limit
+            )
         except SlackApiError as e:
             error_msg = f"Failed to get thread messages: {e.response['error']}"
             logger.error(error_msg)
             raise Exception(error_msg)
+        
+        messages = []
+        for msg in response['messages']:
+            formatted_msg = {
+                'user': msg.get('user', ''),
+                'text': msg.get('text', ''),
+                'ts': msg.get('ts', ''),
+            }
+            if 'bot_id' in msg:
+                formatted_msg['bot_id'] = msg['bot_id']
+            messages.append(formatted_msg)
+        
+        next_cursor = None
+        if response.get('has_more', False):
+            next_cursor = response.get('response_metadata', {}).get('next_cursor') or None
+        return messages, next_cursor
+    
+    def iter_thread_messages(self, thread_id, cursor=None):
+        """
+        Yields the messages within a specific thread, one page at a time
+        Takes thread_id (timestamp) and an optional cursor to resume from
+        Fetches the next page only when the caller has consumed the current one
+        Messages come back from Slack in chronological order
+        """
+        count = 0
+        while True:
+            messages, cursor = self.get_thread_messages_page(thread_id, cursor)
+            count += len(messages)
+            yield from messages
+            if cursor is None:
+                break
+        
+        logger.info("Retrieved %d messages from thread %s", count, thread_id)
+    
+    def get_thread_messages(self, thread_id):
+        """
+        Fetches all messages within a specific thread
+        Returns the full list from iter_thread_messages
+        """
+        return list(self.iter_thread_messages(thread_id))
     
     def post_word_sequence(self, word_data):
         """
         Posts complete word learning sequence to new thread
         Takes word_data dictionary with word, meanings, examples
         Creates initial thread with just the word
-        Posts definitions as first reply
-        Posts examples as second reply
-        Posts user instructions as third reply
+        Posts definitions, examples and user instructions as sections of a single reply
         Returns thread_id for tracking
         Ensures all posts succeed or rolls back
         """
+        # Build every section before the first API call so the posts go out back to back
+        replies = (
+            MEANINGS_HEADER + "\n".join(f"• {meaning}" for meaning in word_data.get('meanings', [])),
+            EXAMPLES_HEADER + "\n".join(f"• {example}" for example in word_data.get('examples', [])),
+            WORD_INSTRUCTIONS,
+        )
+        
         thread_id = None
         try:
             # Create thread with the word
             thread_id = self.create_thread(word_data['word'])
             
-            # Post definitions
-            meanings_text = "📖 *Meanings:*\n" + "\n".join(
-                [f"• {meaning}" for meaning in word_data.get('meanings', [])]
-            )
-            self.post_to_thread(thread_id, meanings_text)
+            # Meanings, examples and instructions go out as one reply, in lesson order
+            self.post_sections_to_thread(thread_id, replies)
             
-            # Post examples
-            examples_text = "💡 *Examples:*\n" + "\n".join(
-                [f"• {example}" for example in word_data.get('examples', [])]
-            )
-            self.post_to_thread(thread_id, examples_text)
-            
-            # Post instructions
-            instructions = (
-                "🎯 *Your turn!*\n"
-                "• Reply '1' if you already knew this word\n"
-                "• Or use the word in an original sentence to learn it"
-            )
-            self.post_to_thread(thread_id, instructions)
-            
-            logger.info(f"Successfully posted complete word sequence for '{word_data['word']}'")
+            logger.info("Successfully posted complete word sequence for '%s'", word_data['word'])
             return thread_id
             
         except Exception as e:
@@ -177,44 +227,73 @@ class SlackClient:
             error_msg = f"Failed to post word sequence: {str(e)}"
             logger.error(error_msg)
             if thread_id:
-                logger.warning(f"Partial thread created with ID: {thread_id}")
+                logger.warning("Partial thread created with ID: %s", thread_id)
             raise Exception(error_msg)
     
-    def validate_webhook(self, request_body, headers):
+    def validate_webhook(self, raw_body, headers):
         """
-        Validates incoming webhook is from Slack
-        Verifies request signature for security
-        Handles URL verification challenge during setup
-        Returns True if valid webhook, False otherwise
-        Prevents unauthorized webhook calls
+        Validates incoming webhook is from Slack and decodes it
+        Takes the raw request body and the request headers; the body must be bytes,
+        exactly as received, since the signature covers those bytes (encode str at the boundary)
+        Recomputes the v0 HMAC-SHA256 signature over "v0:{timestamp}:{body}" with the
+        signing secret and compares it to X-Slack-Signature in constant time
+        Rejects requests whose timestamp is more than SIGNATURE_MAX_AGE seconds old
+        Returns (is_valid, parsed_body); the body is decoded once here so callers and
+        parse_webhook_event can reuse it. parsed_body is None if the signature check
+        fails or the payload is not a JSON object
+        Without a signing secret every request fails, unless verification was explicitly disabled
         """
-        # For Phase 2, we'll implement basic validation
-        # Full signature verification would require SLACK_SIGNING_SECRET
+        if self.verify_signatures and (
+            self.signing_secret is None or not self._signature_matches(raw_body, headers)
+        ):
+            return False, None
+        
+        try:
+            body = orjson.loads(raw_body)
+        except orjson.JSONDecodeError:
+            logger.warning("Webhook body is not valid JSON")
+            return True, None
         
-        # Handle URL verification challenge
-        if isinstance(request_body, str):
-            try:
-                body = json.loads(request_body)
-            except json.JSONDecodeError:
+        if not isinstance(body, dict):
+            logger.warning("Webhook body is not a JSON object")
+            return True, None
+        return True, body
+    
+    def _signature_matches(self, raw_body, headers):
+        """Checks the request's Slack signature and timestamp against the signing secret"""
+        timestamp = headers.get('X-Slack-Request-Timestamp', '')
+        signature = headers.get('X-Slack-Signature', '')
+        if not timestamp or not signature:
+            logger.warning("Webhook missing Slack signature headers")
+            return False
+        # Genuine signatures are ASCII hex; anything else can't match and couldn't be
+        # passed to compare_digest as bytes
+        if not signature.isascii() or not timestamp.isascii():
+            logger.warning("Webhook signature headers contain non-ASCII characters")
+            return False
+        
+        try:
+            if abs(time.time() - int(timestamp)) > SIGNATURE_MAX_AGE:
+                logger.warning("Webhook timestamp outside replay window: %s", timestamp)
                 return False
-        else:
-            body = request_body
-            
-        # Handle Slack URL verification challenge
-        if body.get('type') == 'url_verification':
-            logger.info("Handling Slack URL verification challenge")
-            return {'challenge': body.get('challenge')}
+        except ValueError:
+            return False
         
-        # Basic validation - check if it has expected fields
-        if 'event' in body and 'type' in body:
-            return True
-            
-        return False
+        expected = b'v0=' + hmac.new(
+            self.signing_secret,
+            b'v0:' + timestamp.encode() + b':' + raw_body,
+            hashlib.sha256
+        ).hexdigest().encode()
+        
+        if not hmac.compare_digest(expected, signature.encode()):
+            logger.warning("Webhook signature mismatch")
+            return False
+        return True
     
-    def parse_webhook_event(self, request_body):
+    def parse_webhook_event(self, body):
         """
         Extracts relevant data from Slack webhook payload
-        Parses JSON body to get event details
+        Takes the body already decoded by validate_webhook
         For any other event apart from text-based replies on a thread - don't care
         Returns dictionary with:
         - type: event type (message, app_mention, etc.)
@@ -225,17 +304,12 @@ class SlackClient:
         Handles different event structures safely
         """
         try:
-            if isinstance(request_body, str):
-                body = json.loads(request_body)
-            else:
-                body = request_body
-            
             # Extract event data
             event = body.get('event', {})
             
             # Check if this is a message event
             if event.get('type') != 'message':
-                logger.debug(f"Ignoring non-message event: {event.get('type')}")
+                logger.debug("Ignoring non-message event: %s", event.get('type'))
                 return None
             
             # Ignore bot messages to prevent loops
@@ -258,11 +332,11 @@ class SlackClient:
                 'channel': event.get('channel')
             }
             
-            logger.info(f"Parsed webhook event: {parsed_event}")
+            logger.info("Parsed webhook event: %s", parsed_event)
             return parsed_event
             
         except Exception as e:
-            logger.error(f"Failed to parse webhook event: {str(e)}")
+            logger.error("Failed to parse webhook event: %s", e)
             return None
         
 
@@ -275,17 +349,17 @@ class SlackClient:
             )
             
             if response["ok"]:
-                logger.info(f"Successfully pinned message {message_ts}")
+                logger.info("Successfully pinned message %s", message_ts)
                 return True
             else:
-                logger.warning(f"Failed to pin message: {response.get('error', 'Unknown error')}")
+                logger.warning("Failed to pin message: %s", response.get('error', 'Unknown error'))
                 return False
                 
         except SlackApiError as e:
-            logger.warning(f"Slack API error pinning message: {e.response['error']}")
+            logger.warning("Slack API error pinning message: %s", e.response['error'])
             return False
         except Exception as e:
-            logger.error(f"Unexpected error pinning message: {e}")
+            logger.error("Unexpected error pinning message: %s", e)
             return False
 
     def get_pinned_messages(self):
@@ -294,7 +368,7 @@ class SlackClient:
             response = self.client.pins_list(channel=self.channel_id)
             return response.get('items', [])
         except SlackApiError as e:
-            logger.error(f"Error getting pinned messages: {e}")
+            logger.error("Error getting pinned messages: %s", e)
             return []
 
     def find_theme_thread(self):
@@ -312,5 +386,5 @@ class SlackClient:
                         return message.get('ts')
             return None
         except Exception as e:
-            logger.error(f"Error finding theme thread: {e}")
+            logger.error("Error finding theme thread: %s", e)
             return None
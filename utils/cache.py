@@ -1,9 +1,9 @@
 """
 Cache utilities for deduplication and rate limiting
 """
-from collections import OrderedDict
-from datetime import datetime, timedelta
+from collections import OrderedDict, deque
 import threading
+import time
 import logging
 
 logger = logging.getLogger(__name__)
@@ -11,6 +11,8 @@ logger = logging.getLogger(__name__)
 class TTLCache:
     """Thread-safe TTL cache for event deduplication"""
     
+    __slots__ = ('max_size', 'ttl_seconds', 'cache', 'lock')
+    
     def __init__(self, max_size=10000, ttl_seconds=3600):
         self.max_size = max_size
         self.ttl_seconds = ttl_seconds
@@ -18,46 +20,64 @@ class TTLCache:
         self.lock = threading.Lock()
         
     def add(self, key):
-        """Add a key with current timestamp"""
+        """
+        Add a key with current timestamp
+        The expiry time and log messages are computed outside the lock, so the
+        critical section is only the dict updates
+        """
+        expires_at = time.monotonic() + self.ttl_seconds
+        evicted = 0
         with self.lock:
-            # Clean expired entries first
-            self._clean_expired()
+            # No expiry sweep here: expired entries are dropped lazily by contains(),
+            # by get_stats() and by overflow eviction, keeping add O(1)
             
             # Check if we need to evict oldest entries
             if len(self.cache) >= self.max_size:
                 # Remove 10% of oldest entries
-                num_to_remove = max(1, self.max_size // 10)
-                for _ in range(num_to_remove):
+                evicted = max(1, self.max_size // 10)
+                for _ in range(evicted):
                     self.cache.popitem(last=False)
-                logger.info(f"Cache size limit reached. Evicted {num_to_remove} oldest entries")
             
-            # Add new entry
-            self.cache[key] = datetime.now()
-            logger.debug(f"Added key to cache: {key}")
+            # Add new entry, stored with its absolute monotonic expiry time
+            self.cache[key] = expires_at
+        
+        if evicted:
+            logger.info("Cache size limit reached. Evicted %d oldest entries", evicted)
+        logger.debug("Added key to cache: %s", key)
             
     def contains(self, key):
-        """Check if key exists and is not expired"""
+        """
+        Check if key exists and is not expired
+        Unseen keys, the common case for new events, return without taking the lock;
+        a single dict membership test is atomic, and a key added concurrently could
+        just as well have landed after a locked check
+        """
+        if key not in self.cache:
+            return False
+        
+        now = time.monotonic()
         with self.lock:
-            if key not in self.cache:
+            expires_at = self.cache.get(key)
+            if expires_at is None:
                 return False
                 
-            timestamp = self.cache[key]
-            if datetime.now() - timestamp > timedelta(seconds=self.ttl_seconds):
+            if expires_at < now:
                 del self.cache[key]
-                logger.debug(f"Key expired and removed: {key}")
-                return False
-                
-            # Move to end (LRU behavior)
-            self.cache.move_to_end(key)
-            return True
+            else:
+                # Move to end (LRU behavior)
+                self.cache.move_to_end(key)
+                return True
+        
+        logger.debug("Key expired and removed: %s", key)
+        return False
             
     def _clean_expired(self):
         """Remove expired entries"""
-        now = datetime.now()
+        now = time.monotonic()
         expired_keys = []
         
-        for key, timestamp in self.cache.items():
-            if now - timestamp > timedelta(seconds=self.ttl_seconds):
+        for key, expires_at in self.cache.items():
+            if expires_at < now:
                 expired_keys.append(key)
             else:
                 # Since OrderedDict maintains insertion order, 
@@ -68,11 +88,30 @@ class TTLCache:
             del self.cache[key]
             
         if expired_keys:
-            logger.debug(f"Cleaned {len(expired_keys)} expired entries")
+            logger.debug("Cleaned %d expired entries", len(expired_keys))
+            
+    def purge_expired(self):
+        """
+        Removes every expired entry and returns how many were dropped
+        Meant to be called periodically from existing background work, so expired keys
+        that are never looked up again don't sit in the cache until overflow eviction
+        Scans the whole cache, since entries moved to the end by contains() break the
+        insertion-order shortcut _clean_expired relies on
+        """
+        now = time.monotonic()
+        with self.lock:
+            expired_keys = [key for key, expires_at in self.cache.items() if expires_at < now]
+            for key in expired_keys:
+                del self.cache[key]
+        
+        if expired_keys:
+            logger.debug("Purged %d expired entries", len(expired_keys))
+        return len(expired_keys)
             
     def get_stats(self):
-        """Get cache statistics"""
+        """Get cache statistics, dropping expired entries first so size is accurate"""
         with self.lock:
+            self._clean_expired()
             return {
                 'size': len(self.cache),
                 'max_size': self.max_size,
@@ -82,19 +121,23 @@ class TTLCache:
 class RateLimiter:
     """Simple rate limiter for API calls"""
     
+    __slots__ = ('max_calls', 'time_window', 'calls', 'lock')
+    
     def __init__(self, max_calls=10, time_window=60):
         self.max_calls = max_calls
         self.time_window = time_window  # seconds
-        self.calls = []
+        # Call times in the order they were made, so the oldest is always at the left
+        self.calls = deque()
         self.lock = threading.Lock()
         
     def is_allowed(self):
         """Check if a call is allowed under rate limit"""
         with self.lock:
-            now = datetime.now()
-            # Remove old calls outside time window
-            self.calls = [call_time for call_time in self.calls 
-                         if now - call_time < timedelta(seconds=self.time_window)]
+            now = time.monotonic()
+            # Drop calls that have left the time window from the front
+            calls = self.calls
+            while calls and now - calls[0] >= self.time_window:
+                calls.popleft()
             
             if len(self.calls) < self.max_calls:
                 self.calls.append(now)
@@ -106,6 +149,6 @@ class RateLimiter:
         with self.lock:
             if len(self.calls) < self.max_calls:
                 return 0
-            oldest_call = min(self.calls)
-            wait = (oldest_call + timedelta(seconds=self.time_window) - datetime.now()).total_seconds()
+            oldest_call = self.calls[0]
+            wait = oldest_call + self.time_window - time.monotonic()
             return max(0, wait)
\ No newline at end of file